@@ -10,52 +10,195 @@ and other respondents, organized into reports or data series consisting primaril
 of financial and structure data.
 """
 
+import numpy as np
 import pandas as pd
 import sqlite3
+from collections import defaultdict
 from datetime import datetime
+import json
 import os
+import codecs
+import re
 import sys
 
-def clean_csv_data():
-    """Clean and prepare the MDRM CSV data for database insertion."""
-    print("Reading MDRM CSV file...")
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # pyarrow is optional; without it the CSV is parsed on every run
+    pa = pq = None
+
+# Mapping from MDRM CSV column names to database column names
+COLUMNS_MAPPING = {
+    'MDRM_Identifier': 'mdrm_identifier',
+    'Mnemonic': 'mnemonic', 
+    'Item Code': 'item_code',
+    'Start Date': 'start_date',
+    'End Date': 'end_date',
+    'Item Name': 'item_name',
+    'Confidentiality': 'confidentiality',
+    'ItemType': 'item_type',
+    'Reporting Form': 'reporting_form',
+    'Description': 'description',
+    'SeriesGlossary': 'series_glossary'
+}
+
+INSERT_COLUMNS = list(COLUMNS_MAPPING.values())
+
+# Low-cardinality columns, dictionary-encoded in the Parquet cache
+CATEGORY_COLUMNS = ['mnemonic', 'item_type', 'confidentiality', 'reporting_form']
+
+CHUNK_SIZE = 50_000
+
+CSV_FILE = 'MDRM_CSV.csv'
+
+# Encodings tried for the CSV, in order; latin-1 decodes any byte, so it always matches
+CSV_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+
+# Column types for reading the CSV, so pandas skips type inference. Code columns
+# are read straight into categoricals and everything else as strings.
+CSV_DTYPES = defaultdict(lambda: 'string', {
+    'Confidentiality': 'category',
+    'ItemType': 'category',
+    'Reporting Form': 'category'
+})
+
+# Precomputed /api/stats response served by the web explorer
+STATS_FILE = 'mdrm_stats.json'
+
+# Cleaned copy of the CSV, reused while it is newer than the CSV
+PARQUET_CACHE = 'mdrm_cache.parquet'
+
+# Date formats used in the MDRM CSV, most common first
+DATE_FORMATS = ['%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y', '%Y-%m-%d']
+
+# HTML entities found in MDRM text fields and their replacements
+_ENT_MAP = {'&#x0D;': '\n', '&amp;': '&'}
+_ENT_RE = re.compile('|'.join(map(re.escape, _ENT_MAP)))
+
+def _unescape_entities(text):
+    """Replace MDRM HTML entities in a single pass over the string."""
+    if '&' not in text:
+        return text
+    return _ENT_RE.sub(lambda m: _ENT_MAP[m.group(0)], text)
+
+def _parse_dates(values):
+    """Parse MDRM date strings, trying each known format only on values still unparsed."""
+    dates = pd.to_datetime(values, format=DATE_FORMATS[0], errors='coerce', cache=True)
+    for fmt in DATE_FORMATS[1:]:
+        unparsed = dates.isna() & (values != '')
+        if not unparsed.any():
+            break
+        dates[unparsed] = pd.to_datetime(values[unparsed], format=fmt, errors='coerce', cache=True)
+    return dates
+
+def iter_clean_chunks():
+    """Yield cleaned MDRM DataFrames ready for insertion, using the Parquet cache when it is fresh."""
+    if pq is None:
+        yield from _iter_csv_chunks()
+        return
+    
+    # The cache is only trusted if it is newer than both the CSV and this script,
+    # so a change to the cleaning code rebuilds it
+    if (os.path.exists(PARQUET_CACHE)
+            and os.path.getmtime(PARQUET_CACHE) > os.path.getmtime(CSV_FILE)
+            and os.path.getmtime(PARQUET_CACHE) > os.path.getmtime(__file__)):
+        print(f"Reading cleaned MDRM data from {PARQUET_CACHE}...")
+        for batch in pq.ParquetFile(PARQUET_CACHE).iter_batches(batch_size=CHUNK_SIZE):
+            yield batch.to_pandas()
+        return
+    
+    # Write the cleaned chunks through to a temporary file, only replacing the
+    # cache once the whole CSV has been processed
+    schema = pa.schema([
+        (col, pa.dictionary(pa.int32(), pa.string()) if col in CATEGORY_COLUMNS else pa.string())
+        for col in INSERT_COLUMNS
+    ])
+    tmp_path = PARQUET_CACHE + '.tmp'
+    writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+    try:
+        for df in _iter_csv_chunks():
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            yield df
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    writer.close()
+    os.replace(tmp_path, PARQUET_CACHE)
+
+def detect_encoding(path):
+    """Return the first of CSV_ENCODINGS that decodes the whole file.
+    
+    The CSV is streamed in chunks, so the encoding has to be settled before
+    reading starts; a decode error part-way through can't be retried.
+    """
+    for encoding in CSV_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return CSV_ENCODINGS[-1]
+
+def _iter_csv_chunks():
+    """Read the MDRM CSV in chunks and yield cleaned DataFrames."""
+    encoding = detect_encoding(CSV_FILE)
+    print(f"Reading MDRM CSV file ({encoding})...")
     
     # Read the CSV file, skipping the first line which just says "PUBLIC"
+    reader = pd.read_csv(CSV_FILE, skiprows=1, chunksize=CHUNK_SIZE, dtype=CSV_DTYPES,
+                         na_filter=False, encoding=encoding)
+    
+    for df in reader:
+        # Clean column names (remove extra spaces and trailing commas)
+        df.columns = df.columns.str.strip().str.rstrip(',')
+        
+        # Handle date columns
+        date_columns = ['Start Date', 'End Date']
+        for col in date_columns:
+            if col in df.columns:
+                # Convert dates to proper format, storing unparseable dates as NULL
+                dates = _parse_dates(df[col])
+                df[col] = dates.dt.strftime('%Y-%m-%d %H:%M:%S').astype(object).where(dates.notna(), None)
+        
+        # Clean text fields - remove HTML entities and extra whitespace
+        text_columns = ['Description', 'SeriesGlossary', 'Item Name']
+        for col in text_columns:
+            if col in df.columns:
+                df[col] = df[col].map(_unescape_entities).str.strip()
+        
+        # Create MDRM Identifier by combining Mnemonic and Item Code
+        if 'Mnemonic' in df.columns and 'Item Code' in df.columns:
+            mnemonics = df['Mnemonic'].fillna('').to_numpy(dtype=str)
+            item_codes = df['Item Code'].fillna('').to_numpy(dtype=str)
+            df['MDRM_Identifier'] = np.char.add(mnemonics, item_codes)
+        
+        # Rename and select only the columns we want to insert
+        yield df.rename(columns=COLUMNS_MAPPING)[INSERT_COLUMNS]
+
+def execute_in_transaction(conn, statements):
+    """Run SQL statements atomically in one explicit transaction.
+    
+    sqlite3 only opens transactions implicitly before DML, so DDL such as
+    CREATE INDEX would otherwise autocommit statement by statement.
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
     try:
-        df = pd.read_csv('MDRM_CSV.csv', skiprows=1, encoding='utf-8')
-    except UnicodeDecodeError:
-        # Try with different encoding if UTF-8 fails
-        df = pd.read_csv('MDRM_CSV.csv', skiprows=1, encoding='latin-1')
-    
-    print(f"Loaded {len(df)} records from CSV file")
-    print(f"Columns: {list(df.columns)}")
-    
-    # Clean column names (remove extra spaces and trailing commas)
-    df.columns = df.columns.str.strip().str.rstrip(',')
-    
-    # Handle date columns
-    date_columns = ['Start Date', 'End Date']
-    for col in date_columns:
-        if col in df.columns:
-            # Convert dates to proper format
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-    
-    # Clean text fields - remove HTML entities and extra whitespace
-    text_columns = ['Description', 'SeriesGlossary', 'Item Name']
-    for col in text_columns:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace('&#x0D;', '\n', regex=False)
-            df[col] = df[col].str.replace('&amp;', '&', regex=False)
-            df[col] = df[col].str.strip()
-    
-    # Create MDRM Identifier by combining Mnemonic and Item Code
-    if 'Mnemonic' in df.columns and 'Item Code' in df.columns:
-        df['MDRM_Identifier'] = df['Mnemonic'].astype(str) + df['Item Code'].astype(str)
-    
-    return df
-
-def create_database(df):
-    """Create SQLite database and insert the MDRM data."""
+        for sql in statements:
+            cursor.execute(sql)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+def create_database(chunks):
+    """Create SQLite database and insert the MDRM data from an iterable of cleaned chunks."""
     db_name = 'mdrm_database.db'
     
     print(f"Creating SQLite database: {db_name}")
@@ -68,6 +211,14 @@ def create_database(df):
     conn = sqlite3.connect(db_name)
     cursor = conn.cursor()
     
+    # Tune SQLite for a one-off bulk load. The page size must be set before any
+    # table is created.
+    conn.execute("PRAGMA page_size=8192")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-200000")
+    
     # Create the main MDRM table
     create_table_sql = """
     CREATE TABLE mdrm_data (
@@ -89,6 +240,22 @@ def create_database(df):
     
     cursor.execute(create_table_sql)
     
+    print("Database schema created successfully")
+    
+    # Insert data into the database
+    print("Inserting data into database...")
+    
+    insert_sql = f"""
+    INSERT INTO mdrm_data ({', '.join(INSERT_COLUMNS)})
+    VALUES ({', '.join('?' * len(INSERT_COLUMNS))})
+    """
+    
+    # Stream each cleaned chunk into the table within a single transaction. The
+    # row iterator is consumed lazily, so no list of tuples is built alongside the chunk.
+    with conn:
+        for df_chunk in chunks:
+            cursor.executemany(insert_sql, df_chunk.itertuples(index=False, name=None))
+    
     # Create indexes for better query performance
     indexes = [
         "CREATE INDEX idx_mdrm_identifier ON mdrm_data(mdrm_identifier);",
@@ -98,44 +265,26 @@ def create_database(df):
         "CREATE INDEX idx_item_type ON mdrm_data(item_type);",
         "CREATE INDEX idx_reporting_form ON mdrm_data(reporting_form);",
         "CREATE INDEX idx_start_date ON mdrm_data(start_date);",
-        "CREATE INDEX idx_end_date ON mdrm_data(end_date);"
+        "CREATE INDEX idx_end_date ON mdrm_data(end_date);",
+        "CREATE INDEX idx_confidentiality ON mdrm_data(confidentiality);"
     ]
     
-    for index_sql in indexes:
-        cursor.execute(index_sql)
-    
-    print("Database schema created successfully")
-    
-    # Insert data into the database
-    print("Inserting data into database...")
-    
-    # Prepare data for insertion
-    columns_mapping = {
-        'MDRM_Identifier': 'mdrm_identifier',
-        'Mnemonic': 'mnemonic', 
-        'Item Code': 'item_code',
-        'Start Date': 'start_date',
-        'End Date': 'end_date',
-        'Item Name': 'item_name',
-        'Confidentiality': 'confidentiality',
-        'ItemType': 'item_type',
-        'Reporting Form': 'reporting_form',
-        'Description': 'description',
-        'SeriesGlossary': 'series_glossary'
-    }
-    
-    # Select and rename columns
-    df_clean = df.copy()
-    for old_col, new_col in columns_mapping.items():
-        if old_col in df_clean.columns:
-            df_clean = df_clean.rename(columns={old_col: new_col})
-    
-    # Select only the columns we want to insert
-    insert_columns = list(columns_mapping.values())
-    df_insert = df_clean[insert_columns].copy()
-    
-    # Insert data using pandas to_sql method
-    df_insert.to_sql('mdrm_data', conn, if_exists='append', index=False)
+    # Build indexes after the bulk load so inserts don't maintain every B-tree row by row
+    print("Creating indexes...")
+    execute_in_transaction(conn, indexes)
+    
+    # Full-text index over the searchable columns, used by the web explorer
+    print("Creating full-text search index...")
+    execute_in_transaction(conn, [
+        """
+        CREATE VIRTUAL TABLE mdrm_fts USING fts5(
+            item_name, mnemonic, item_code,
+            content='mdrm_data', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        """,
+        "INSERT INTO mdrm_fts(mdrm_fts) VALUES('rebuild')"
+    ])
     
     # Get record count
     cursor.execute("SELECT COUNT(*) FROM mdrm_data")
@@ -145,11 +294,18 @@ def create_database(df):
     
     # Create summary statistics table
     create_summary_stats(cursor)
+    write_stats_json(cursor)
+    
+    # Refresh planner statistics so queries pick up the new indexes
+    cursor.execute("ANALYZE")
     
     conn.commit()
+    
+    # Leave a self-contained database file behind once loading is done
+    conn.execute("PRAGMA journal_mode=DELETE")
     conn.close()
     
-    return db_name
+    return db_name, record_count
 
 def create_summary_stats(cursor):
     """Create summary statistics about the MDRM data."""
@@ -164,23 +320,32 @@ def create_summary_stats(cursor):
     );
     """)
     
-    # Calculate and insert summary statistics
-    stats_queries = [
-        ("total_records", "SELECT COUNT(*) FROM mdrm_data"),
-        ("unique_mnemonics", "SELECT COUNT(DISTINCT mnemonic) FROM mdrm_data"),
-        ("unique_item_codes", "SELECT COUNT(DISTINCT item_code) FROM mdrm_data"),
-        ("unique_reporting_forms", "SELECT COUNT(DISTINCT reporting_form) FROM mdrm_data WHERE reporting_form IS NOT NULL AND reporting_form != ''"),
-        ("confidential_items", "SELECT COUNT(*) FROM mdrm_data WHERE confidentiality = 'Y'"),
-        ("public_items", "SELECT COUNT(*) FROM mdrm_data WHERE confidentiality = 'N'"),
-        ("active_items", "SELECT COUNT(*) FROM mdrm_data WHERE end_date > date('now')"),
-        ("expired_items", "SELECT COUNT(*) FROM mdrm_data WHERE end_date <= date('now')")
+    # Calculate all summary statistics in a single pass over the table
+    stat_names = [
+        "total_records",
+        "unique_mnemonics",
+        "unique_item_codes",
+        "unique_reporting_forms",
+        "confidential_items",
+        "public_items",
+        "active_items",
+        "expired_items"
     ]
-    
-    for stat_name, query in stats_queries:
-        cursor.execute(query)
-        result = cursor.fetchone()[0]
-        cursor.execute("INSERT INTO mdrm_summary (statistic_name, statistic_value) VALUES (?, ?)", 
-                      (stat_name, str(result)))
+    cursor.execute("""
+    SELECT 
+        COUNT(*),
+        COUNT(DISTINCT mnemonic),
+        COUNT(DISTINCT item_code),
+        COUNT(DISTINCT CASE WHEN reporting_form != '' THEN reporting_form END),
+        COUNT(CASE WHEN confidentiality = 'Y' THEN 1 END),
+        COUNT(CASE WHEN confidentiality = 'N' THEN 1 END),
+        COUNT(CASE WHEN end_date > date('now') THEN 1 END),
+        COUNT(CASE WHEN end_date <= date('now') THEN 1 END)
+    FROM mdrm_data
+    """)
+    values = cursor.fetchone()
+    cursor.executemany("INSERT INTO mdrm_summary (statistic_name, statistic_value) VALUES (?, ?)", 
+                       [(stat_name, str(value)) for stat_name, value in zip(stat_names, values)])
     
     # Item type distribution
     cursor.execute("""
@@ -191,9 +356,30 @@ def create_summary_stats(cursor):
     """)
     
     item_types = cursor.fetchall()
-    for item_type, count in item_types:
-        cursor.execute("INSERT INTO mdrm_summary (statistic_name, statistic_value) VALUES (?, ?)", 
-                      (f"item_type_{item_type}", str(count)))
+    cursor.executemany("INSERT INTO mdrm_summary (statistic_name, statistic_value) VALUES (?, ?)", 
+                       [(f"item_type_{item_type}", str(count)) for item_type, count in item_types])
+
+def write_stats_json(cursor):
+    """Write the statistics shown by the web explorer to a static JSON file."""
+    print(f"Writing web statistics to {STATS_FILE}...")
+    
+    cursor.execute("SELECT statistic_name, statistic_value FROM mdrm_summary")
+    stats = dict(cursor.fetchall())
+    
+    # Get top mnemonics
+    cursor.execute("""
+        SELECT mnemonic, COUNT(*) as count 
+        FROM mdrm_data 
+        GROUP BY mnemonic 
+        ORDER BY count DESC 
+        LIMIT 10
+    """)
+    stats['top_mnemonics'] = [
+        {'mnemonic': mnemonic, 'count': count} for mnemonic, count in cursor.fetchall()
+    ]
+    
+    with open(STATS_FILE, 'w') as f:
+        json.dump(stats, f)
 
 def main():
     """Main function to process MDRM data and create database."""
@@ -201,22 +387,19 @@ def main():
     print("=" * 50)
     
     # Check if CSV file exists
-    if not os.path.exists('MDRM_CSV.csv'):
+    if not os.path.exists(CSV_FILE):
         print("Error: MDRM_CSV.csv file not found!")
         print("Please ensure the MDRM.zip file has been downloaded and extracted.")
         sys.exit(1)
     
     try:
-        # Clean and process the CSV data
-        df = clean_csv_data()
-        
-        # Create the SQLite database
-        db_name = create_database(df)
+        # Clean and process the CSV data in chunks, streaming into the database
+        db_name, record_count = create_database(iter_clean_chunks())
         
         print("\n" + "=" * 50)
         print("Database creation completed successfully!")
         print(f"Database file: {db_name}")
-        print(f"Total records processed: {len(df)}")
+        print(f"Total records processed: {record_count}")
         
         # Display some sample queries
         print("\nSample queries you can run:")
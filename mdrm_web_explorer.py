@@ -7,478 +7,263 @@ A simple Flask web application to explore the MDRM (Micro Data Reference Manual)
 Provides search functionality and data browsing capabilities.
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, request, jsonify
 import sqlite3
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+import json
 import os
+import re
+import threading
+
+try:
+    import apsw
+except ImportError:
+    # apsw is optional; fall back to the standard library sqlite3 module
+    apsw = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to the standard library encoder
+    orjson = None
 
 app = Flask(__name__)
 
+# The database is read-only once created, so connections are opened read-only
+# against a shared cache and kept open for the life of each worker thread
+DB_URI = 'file:mdrm_database.db?mode=ro&cache=shared'
+
+# Static page served at /
+INDEX_FILE = os.path.join(app.root_path, 'templates', 'index.html')
+
+# Statistics written by create_mdrm_database.py alongside the database
+STATS_FILE = 'mdrm_stats.json'
+
+_local = threading.local()
+
+# Columns returned by searches and by the item details endpoint
+SEARCH_COLUMNS = [
+    'mdrm_identifier', 'mnemonic', 'item_code', 'item_name', 'item_type',
+    'confidentiality', 'start_date', 'end_date'
+]
+DETAIL_COLUMNS = [
+    'id', 'mdrm_identifier', 'mnemonic', 'item_code', 'start_date', 'end_date',
+    'item_name', 'confidentiality', 'item_type', 'reporting_form', 'description',
+    'series_glossary', 'created_at'
+]
+
+# Bounds on the number of rows a single search may return
+MAX_SEARCH_LIMIT = 1000
+
+# Completed search responses, most recently used last, bounded by entry count and
+# total size; responses larger than the per-entry limit are never cached
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+SEARCH_CACHE_MAX_ENTRY_BYTES = 512 * 1024
+_search_cache = OrderedDict()
+_search_cache_bytes = 0
+_search_cache_lock = threading.Lock()
+
+# Searchable columns and the ordering applied to their results
+SEARCH_ORDER = {
+    'item_name': 'item_name',
+    'mnemonic': 'item_name',
+    'item_code': 'mnemonic, item_name'
+}
+
 def get_db_connection():
-    """Get database connection."""
-    conn = sqlite3.connect('mdrm_database.db')
-    conn.row_factory = sqlite3.Row
+    """Get the calling thread's long-lived, read-only database connection."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        if apsw is not None:
+            conn = apsw.Connection(DB_URI, flags=apsw.SQLITE_OPEN_READONLY | apsw.SQLITE_OPEN_URI)
+        else:
+            conn = sqlite3.connect(DB_URI, uri=True, check_same_thread=False)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA query_only=ON")
+        _local.conn = conn
     return conn
 
+def iter_dicts(sql, params, columns):
+    """Run a query and yield its rows as dictionaries keyed by the given column names.
+    
+    Both apsw and sqlite3 yield plain tuples here, avoiding a Row object per result.
+    """
+    cursor = get_db_connection().cursor()
+    for row in cursor.execute(sql, params):
+        yield dict(zip(columns, row))
+
+def fetch_dicts(sql, params, columns):
+    """Run a query and return all of its rows as dictionaries."""
+    return list(iter_dicts(sql, params, columns))
+
+def dump_json(data):
+    """Serialize data to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, default=str).encode('utf-8')
+
+def fts_match_expression(column, query):
+    """Build an FTS5 prefix query on one column, or None if the query has no searchable terms."""
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    # Quote every term so user input can never be parsed as FTS syntax
+    phrases = ' '.join(f'"{term}"*' for term in terms)
+    return f"{column} : ({phrases})"
+
+@lru_cache(maxsize=None)
+def index_html():
+    """Read the main page markup, which is static and needs no template rendering."""
+    with open(INDEX_FILE, 'rb') as f:
+        return f.read()
+
 @app.route('/')
 def index():
     """Main page with search interface."""
-    return render_template('index.html')
+    response = app.response_class(index_html(), mimetype='text/html')
+    response.add_etag()
+    return response.make_conditional(request)
 
-@app.route('/api/search')
-def search():
-    """API endpoint for searching MDRM data."""
-    query = request.args.get('q', '').strip()
-    search_type = request.args.get('type', 'item_name')
-    limit = int(request.args.get('limit', 50))
-    
-    conn = get_db_connection()
-    
+def iter_search_rows(query, search_type, limit):
+    """Run a search and yield the matching rows as they are fetched."""
     if not query:
         # Return recent items if no query
-        sql = """
-        SELECT mdrm_identifier, mnemonic, item_code, item_name, item_type, 
-               confidentiality, start_date, end_date
+        sql = f"""
+        SELECT {', '.join(SEARCH_COLUMNS)}
         FROM mdrm_data 
         ORDER BY start_date DESC 
         LIMIT ?
         """
-        results = conn.execute(sql, (limit,)).fetchall()
-    else:
-        # Search based on type
-        if search_type == 'item_name':
-            sql = """
-            SELECT mdrm_identifier, mnemonic, item_code, item_name, item_type, 
-                   confidentiality, start_date, end_date
-            FROM mdrm_data 
-            WHERE item_name LIKE ? 
-            ORDER BY item_name 
-            LIMIT ?
-            """
-            results = conn.execute(sql, (f'%{query}%', limit)).fetchall()
-        elif search_type == 'mnemonic':
-            sql = """
-            SELECT mdrm_identifier, mnemonic, item_code, item_name, item_type, 
-                   confidentiality, start_date, end_date
-            FROM mdrm_data 
-            WHERE mnemonic LIKE ? 
-            ORDER BY item_name 
-            LIMIT ?
-            """
-            results = conn.execute(sql, (f'%{query}%', limit)).fetchall()
-        elif search_type == 'item_code':
-            sql = """
-            SELECT mdrm_identifier, mnemonic, item_code, item_name, item_type, 
-                   confidentiality, start_date, end_date
-            FROM mdrm_data 
-            WHERE item_code LIKE ? 
-            ORDER BY mnemonic, item_name 
-            LIMIT ?
-            """
-            results = conn.execute(sql, (f'%{query}%', limit)).fetchall()
+        yield from iter_dicts(sql, (limit,), SEARCH_COLUMNS)
+    elif search_type in SEARCH_ORDER:
+        # Search based on type, using the full-text index where possible
+        match = fts_match_expression(search_type, query)
+        if match is None or (search_type == 'item_code' and query.isdigit()):
+            # Item codes are numbers users search by substring, which FTS can't match
+            where_sql, param = f"{search_type} LIKE ?", f'%{query}%'
         else:
-            results = []
+            where_sql, param = "id IN (SELECT rowid FROM mdrm_fts WHERE mdrm_fts MATCH ?)", match
+        
+        sql = f"""
+        SELECT {', '.join(SEARCH_COLUMNS)}
+        FROM mdrm_data 
+        WHERE {where_sql} 
+        ORDER BY {SEARCH_ORDER[search_type]} 
+        LIMIT ?
+        """
+        yield from iter_dicts(sql, (param, limit), SEARCH_COLUMNS)
+
+def iter_search_ndjson(query, search_type, limit):
+    """Yield search results as newline-delimited JSON, one line per row.
+    
+    The database is read-only while the app runs, so each completed response is
+    cached for the life of the process and replayed in one piece on repeat searches.
+    """
+    key = (query, search_type, limit)
+    with _search_cache_lock:
+        cached = _search_cache.get(key)
+        if cached is not None:
+            _search_cache.move_to_end(key)
+    if cached is not None:
+        yield cached
+        return
+    
+    lines = []
+    size = 0
+    for row in iter_search_rows(query, search_type, limit):
+        line = dump_json(row) + b'\n'
+        if lines is not None:
+            size += len(line)
+            if size > SEARCH_CACHE_MAX_ENTRY_BYTES:
+                # Too large to cache; stop holding on to the lines already sent
+                lines = None
+            else:
+                lines.append(line)
+        yield line
     
-    conn.close()
+    if lines is not None:
+        cache_search_response(key, b''.join(lines))
+
+def cache_search_response(key, body):
+    """Store a completed search response, evicting old entries to stay within bounds."""
+    global _search_cache_bytes
+    with _search_cache_lock:
+        previous = _search_cache.pop(key, None)
+        if previous is not None:
+            _search_cache_bytes -= len(previous)
+        _search_cache[key] = body
+        _search_cache_bytes += len(body)
+        while (len(_search_cache) > SEARCH_CACHE_SIZE
+               or _search_cache_bytes > SEARCH_CACHE_MAX_BYTES):
+            _, evicted = _search_cache.popitem(last=False)
+            _search_cache_bytes -= len(evicted)
+
+@app.route('/api/search')
+def search():
+    """API endpoint for searching MDRM data."""
+    query = request.args.get('q', '').strip()
+    search_type = request.args.get('type', 'item_name')
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
     
-    # Convert to list of dictionaries
-    data = []
-    for row in results:
-        data.append({
-            'mdrm_identifier': row['mdrm_identifier'],
-            'mnemonic': row['mnemonic'],
-            'item_code': row['item_code'],
-            'item_name': row['item_name'],
-            'item_type': row['item_type'],
-            'confidentiality': row['confidentiality'],
-            'start_date': row['start_date'],
-            'end_date': row['end_date']
-        })
+    # SQLite treats a negative LIMIT as unlimited, so clamp before querying or caching
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
     
-    return jsonify(data)
+    response = app.response_class(iter_search_ndjson(query, search_type, limit), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
 
 @app.route('/api/details/<mdrm_id>')
 def get_details(mdrm_id):
     """Get detailed information for a specific MDRM item."""
-    conn = get_db_connection()
-    
-    sql = """
-    SELECT * FROM mdrm_data 
+    sql = f"""
+    SELECT {', '.join(DETAIL_COLUMNS)} FROM mdrm_data 
     WHERE mdrm_identifier = ?
+    LIMIT 1
     """
     
-    result = conn.execute(sql, (mdrm_id,)).fetchone()
-    conn.close()
+    results = fetch_dicts(sql, (mdrm_id,), DETAIL_COLUMNS)
     
-    if result:
-        return jsonify(dict(result))
+    if results:
+        return jsonify(results[0])
     else:
         return jsonify({'error': 'Item not found'}), 404
 
+@lru_cache(maxsize=None)
+def stats_json():
+    """Read the statistics precomputed by create_mdrm_database.py."""
+    with open(STATS_FILE, 'rb') as f:
+        return f.read()
+
 @app.route('/api/stats')
 def get_stats():
     """Get database statistics."""
-    conn = get_db_connection()
-    
-    # Get summary statistics
-    stats = {}
-    summary_results = conn.execute("SELECT * FROM mdrm_summary").fetchall()
-    for row in summary_results:
-        stats[row['statistic_name']] = row['statistic_value']
-    
-    # Get top mnemonics
-    top_mnemonics = conn.execute("""
-        SELECT mnemonic, COUNT(*) as count 
-        FROM mdrm_data 
-        GROUP BY mnemonic 
-        ORDER BY count DESC 
-        LIMIT 10
-    """).fetchall()
-    
-    stats['top_mnemonics'] = [dict(row) for row in top_mnemonics]
-    
-    conn.close()
-    return jsonify(stats)
-
-# Create templates directory and HTML template
-def create_templates():
-    """Create the HTML template for the web interface."""
-    os.makedirs('templates', exist_ok=True)
-    
-    html_content = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MDRM Explorer</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .header {
-            background-color: #2c3e50;
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-        }
-        .search-container {
-            background-color: white;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        .search-box {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 10px;
-        }
-        input[type="text"] {
-            flex: 1;
-            padding: 10px;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            font-size: 16px;
-        }
-        select, button {
-            padding: 10px;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            font-size: 16px;
-        }
-        button {
-            background-color: #3498db;
-            color: white;
-            border: none;
-            cursor: pointer;
-        }
-        button:hover {
-            background-color: #2980b9;
-        }
-        .results-container {
-            background-color: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        .results-header {
-            background-color: #34495e;
-            color: white;
-            padding: 15px;
-            border-radius: 8px 8px 0 0;
-        }
-        .results-table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        .results-table th, .results-table td {
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #ddd;
-        }
-        .results-table th {
-            background-color: #ecf0f1;
-            font-weight: bold;
-        }
-        .results-table tr:hover {
-            background-color: #f8f9fa;
-        }
-        .item-type {
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-            font-weight: bold;
-        }
-        .type-F { background-color: #e8f5e8; color: #2d5a2d; }
-        .type-S { background-color: #e8f0ff; color: #1a4480; }
-        .type-D { background-color: #fff3e0; color: #8b4513; }
-        .type-R { background-color: #ffeaea; color: #8b0000; }
-        .type-P { background-color: #f0e8ff; color: #4b0082; }
-        .confidential { color: #e74c3c; font-weight: bold; }
-        .public { color: #27ae60; font-weight: bold; }
-        .stats-container {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-        .stat-card {
-            background-color: white;
-            padding: 15px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            text-align: center;
-        }
-        .stat-number {
-            font-size: 24px;
-            font-weight: bold;
-            color: #2c3e50;
-        }
-        .stat-label {
-            font-size: 14px;
-            color: #7f8c8d;
-            margin-top: 5px;
-        }
-        .loading {
-            text-align: center;
-            padding: 20px;
-            color: #7f8c8d;
-        }
-        .no-results {
-            text-align: center;
-            padding: 40px;
-            color: #7f8c8d;
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>MDRM Explorer</h1>
-        <p>Micro Data Reference Manual - Federal Reserve Banking Data Dictionary</p>
-    </div>
-
-    <div id="stats-container" class="stats-container">
-        <!-- Stats will be loaded here -->
-    </div>
-
-    <div class="search-container">
-        <h3>Search MDRM Data</h3>
-        <div class="search-box">
-            <input type="text" id="searchInput" placeholder="Enter search term..." />
-            <select id="searchType">
-                <option value="item_name">Item Name</option>
-                <option value="mnemonic">Mnemonic</option>
-                <option value="item_code">Item Code</option>
-            </select>
-            <button onclick="performSearch()">Search</button>
-            <button onclick="loadRecentItems()">Show Recent</button>
-        </div>
-        <p><strong>Examples:</strong> Search for "ASSETS", "RCON", "2170", etc.</p>
-    </div>
-
-    <div class="results-container">
-        <div class="results-header">
-            <h3 id="resultsTitle">Search Results</h3>
-        </div>
-        <div id="resultsContent">
-            <div class="loading">Loading recent items...</div>
-        </div>
-    </div>
-
-    <script>
-        // Load statistics on page load
-        window.onload = function() {
-            loadStats();
-            loadRecentItems();
-        };
-
-        // Allow Enter key to trigger search
-        document.getElementById('searchInput').addEventListener('keypress', function(e) {
-            if (e.key === 'Enter') {
-                performSearch();
-            }
-        });
-
-        function loadStats() {
-            fetch('/api/stats')
-                .then(response => response.json())
-                .then(data => {
-                    const statsContainer = document.getElementById('stats-container');
-                    statsContainer.innerHTML = `
-                        <div class="stat-card">
-                            <div class="stat-number">${data.total_records}</div>
-                            <div class="stat-label">Total Records</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-number">${data.unique_mnemonics}</div>
-                            <div class="stat-label">Unique Mnemonics</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-number">${data.unique_item_codes}</div>
-                            <div class="stat-label">Unique Item Codes</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-number">${data.public_items}</div>
-                            <div class="stat-label">Public Items</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-number">${data.confidential_items}</div>
-                            <div class="stat-label">Confidential Items</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-number">${data.unique_reporting_forms}</div>
-                            <div class="stat-label">Reporting Forms</div>
-                        </div>
-                    `;
-                })
-                .catch(error => {
-                    console.error('Error loading stats:', error);
-                });
-        }
-
-        function performSearch() {
-            const query = document.getElementById('searchInput').value;
-            const searchType = document.getElementById('searchType').value;
-            
-            document.getElementById('resultsContent').innerHTML = '<div class="loading">Searching...</div>';
-            document.getElementById('resultsTitle').textContent = `Search Results for "${query}"`;
-            
-            const url = `/api/search?q=${encodeURIComponent(query)}&type=${searchType}&limit=100`;
-            
-            fetch(url)
-                .then(response => response.json())
-                .then(data => displayResults(data))
-                .catch(error => {
-                    console.error('Error:', error);
-                    document.getElementById('resultsContent').innerHTML = '<div class="no-results">Error loading results</div>';
-                });
-        }
-
-        function loadRecentItems() {
-            document.getElementById('resultsContent').innerHTML = '<div class="loading">Loading recent items...</div>';
-            document.getElementById('resultsTitle').textContent = 'Recent Items';
-            
-            fetch('/api/search?limit=50')
-                .then(response => response.json())
-                .then(data => displayResults(data))
-                .catch(error => {
-                    console.error('Error:', error);
-                    document.getElementById('resultsContent').innerHTML = '<div class="no-results">Error loading results</div>';
-                });
-        }
-
-        function displayResults(data) {
-            const resultsContent = document.getElementById('resultsContent');
-            
-            if (data.length === 0) {
-                resultsContent.innerHTML = '<div class="no-results">No results found</div>';
-                return;
-            }
-            
-            let html = `
-                <table class="results-table">
-                    <thead>
-                        <tr>
-                            <th>MDRM ID</th>
-                            <th>Mnemonic</th>
-                            <th>Item Code</th>
-                            <th>Item Name</th>
-                            <th>Type</th>
-                            <th>Confidentiality</th>
-                            <th>Start Date</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            `;
-            
-            data.forEach(item => {
-                const typeClass = `type-${item.item_type}`;
-                const confClass = item.confidentiality === 'Y' ? 'confidential' : 'public';
-                const confText = item.confidentiality === 'Y' ? 'Confidential' : 'Public';
-                
-                html += `
-                    <tr onclick="showDetails('${item.mdrm_identifier}')" style="cursor: pointer;">
-                        <td><strong>${item.mdrm_identifier}</strong></td>
-                        <td>${item.mnemonic}</td>
-                        <td>${item.item_code}</td>
-                        <td>${item.item_name}</td>
-                        <td><span class="item-type ${typeClass}">${item.item_type}</span></td>
-                        <td><span class="${confClass}">${confText}</span></td>
-                        <td>${item.start_date ? new Date(item.start_date).toLocaleDateString() : 'N/A'}</td>
-                    </tr>
-                `;
-            });
-            
-            html += '</tbody></table>';
-            resultsContent.innerHTML = html;
-        }
-
-        function showDetails(mdrm_id) {
-            fetch(`/api/details/${mdrm_id}`)
-                .then(response => response.json())
-                .then(data => {
-                    if (data.error) {
-                        alert('Error loading details: ' + data.error);
-                        return;
-                    }
-                    
-                    const description = data.description || 'No description available';
-                    const seriesGlossary = data.series_glossary || 'No series glossary available';
-                    
-                    alert(`MDRM ID: ${data.mdrm_identifier}\\n\\nItem Name: ${data.item_name}\\n\\nDescription: ${description}\\n\\nSeries Glossary: ${seriesGlossary}`);
-                })
-                .catch(error => {
-                    console.error('Error:', error);
-                    alert('Error loading item details');
-                });
-        }
-    </script>
-</body>
-</html>
-    '''
-    
-    with open('templates/index.html', 'w') as f:
-        f.write(html_content)
+    return app.response_class(stats_json(), mimetype='application/json')
 
 if __name__ == '__main__':
-    # Create templates
-    create_templates()
-    
-    # Check if database exists
-    if not os.path.exists('mdrm_database.db'):
-        print("Error: mdrm_database.db not found!")
-        print("Please run create_mdrm_database.py first to create the database.")
-        exit(1)
+    # Check if database and precomputed statistics exist
+    for required_file in ('mdrm_database.db', STATS_FILE):
+        if not os.path.exists(required_file):
+            print(f"Error: {required_file} not found!")
+            print("Please run create_mdrm_database.py first to create the database.")
+            exit(1)
     
     print("Starting MDRM Web Explorer...")
     print("Access the application at: http://localhost:51180")
     
-    # Run the Flask app
-    app.run(host='0.0.0.0', port=51180, debug=True)
+    if os.environ.get('PRODUCTION') == '1':
+        # Serve concurrent requests from a thread pool; each thread keeps its own
+        # read-only connection onto the shared SQLite cache
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=51180, threads=8)
+    else:
+        # Run the Flask development server
+        app.run(host='0.0.0.0', port=51180, debug=True)
 